@@ -1,4 +1,5 @@
-import os, sys, time
+import hashlib, os, sys, threading, time
+from collections import OrderedDict
 from datetime import date as _date
 
 # src yolunu ekle ki import çalışsın
@@ -8,7 +9,7 @@ if SRC not in sys.path:
     sys.path.insert(0, SRC)
 
 import streamlit as st
-from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor
 from hitcapsule.billboard import fetch_hot100
 from hitcapsule.spotify_client import SpotifyClient
 from hitcapsule.artwork import make_cover, make_story_poster
@@ -129,18 +130,113 @@ def _store_result(**kwargs):
 def _key_norm(title: str, artist: str) -> str:
     return f"{(title or '').lower().strip()} — {(artist or '').lower().strip()}"
 
+@st.cache_resource(show_spinner=False)
+def _get_spotify(enable_cover_upload: bool) -> SpotifyClient:
+    """Tek client: env/OAuth kurulumu ve current_user() çağrısı her submit'te tekrarlanmaz."""
+    return SpotifyClient(enable_cover_upload=enable_cover_upload)
+
+# Eşleşme önbelleği: yanlış/kalkmış uri sonsuza dek kalmasın, bellek sınırlı olsun
+MATCH_CACHE_TTL = 3600
+MATCH_CACHE_SIZE = 5000
+
+class _MatchCache:
+    """TTL'li, boyutu sınırlı LRU: (market, başlık — sanatçı, yıl) → uri. Thread-safe."""
+
+    def __init__(self, ttl: float = MATCH_CACHE_TTL, maxsize: int = MATCH_CACHE_SIZE) -> None:
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            uri, expires_at = hit
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return uri
+
+    def put(self, key, uri: str) -> None:
+        with self._lock:
+            self._data[key] = (uri, time.monotonic() + self._ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+@st.cache_resource(show_spinner=False)
+def _search_cache() -> _MatchCache:
+    """Rerun'lar ve oturumlar arasında paylaşılan arama sonuçları."""
+    return _MatchCache()
+
+class _EmptyChart(Exception):
+    """Boş chart; st.cache_data istisnaları saklamaz, bir sonraki submit yeniden çeker."""
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def _fetch_hot100_nonempty(date_yyyy_mm_dd: str):
+    chart = fetch_hot100(date_yyyy_mm_dd)
+    if not chart:
+        raise _EmptyChart(date_yyyy_mm_dd)
+    return chart
+
+def fetch_hot100_cached(date_yyyy_mm_dd: str):
+    """
+    Aynı tarih için sayfayı tekrar indirip parse etme (1 gün TTL). Boş sonuç
+    (düzen değişikliği, bot/onay sayfası) önbelleğe yazılmaz, [] olarak döner.
+    """
+    try:
+        return _fetch_hot100_nonempty(date_yyyy_mm_dd)
+    except _EmptyChart:
+        return []
+
+def _artifact_path(kind: str, date_text: str, ext: str, *parts) -> str:
+    """İçeriği belirleyen girdilerden deterministik dosya adı (aynı girdi → aynı dosya)."""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:10]
+    slug = date_text.replace(' ', '_').replace(':', '-')
+    return os.path.join("artifacts", f"{kind}_{slug}_{digest}.{ext}")
+
+# Girdi başına ayrı dosya kalır; klasör en yeni bu kadar dosyayla sınırlı tutulur
+ARTIFACT_KEEP = 40
+
+def _render_once(path: str, render, *args, **kwargs) -> str:
+    """Dosya yoksa çiz; varsa yeniden kullan (adı zaten girdilerin özeti)."""
+    if os.path.exists(path):
+        os.utime(path)  # budamada yeni sayılsın
+        return path
+    return render(*args, **kwargs)
+
+def _prune_artifacts(keep: int = ARTIFACT_KEEP) -> None:
+    """artifacts/ içinde en son kullanılan `keep` dosya dışındakileri sil."""
+    try:
+        entries = [e for e in os.scandir("artifacts") if e.is_file()]
+    except FileNotFoundError:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for e in entries[keep:]:
+        try:
+            os.remove(e.path)
+        except OSError:
+            pass
+
 def _interleave_unique(list_a, list_b, limit=100):
     """A,B,A,B... sırayla; başlık+sanatçıya göre yinelenenleri at; limit kadar."""
+    # Anahtarlar liste başına bir kez hesaplanır
+    ka = [(e, _key_norm(e.title, e.artist)) for e in list_a]
+    kb = [(e, _key_norm(e.title, e.artist)) for e in list_b]
     out, seen = [], set()
-    for a, b in zip_longest(list_a, list_b, fillvalue=None):
-        for e in (a, b):
-            if not e:
+    seen_add, out_append = seen.add, out.append
+    for i in range(max(len(ka), len(kb))):
+        for lst in (ka, kb):
+            if i >= len(lst):
                 continue
-            k = _key_norm(e.title, e.artist)
+            e, k = lst[i]
             if k in seen:
                 continue
-            out.append(e)
-            seen.add(k)
+            seen_add(k)
+            out_append(e)
             if len(out) >= limit:
                 return out
     return out
@@ -152,70 +248,118 @@ if submitted:
     status = st.empty()
     bar = st.progress(0, text="Starting…")
 
-    # --- Chart(lar)ı çek ---
-    if not blend_mode:
-        date1 = d1.strftime("%Y-%m-%d")
-        status.write("Fetching Billboard Hot 100…")
-        chart = fetch_hot100(date1)
-        year = date1.split("-")[0]
-        list_for_search = chart
-        poster_date_text = date1
-        default_name = f"{date1} Billboard Hot 100"
-        subtitle = None
-    else:
-        date1 = d1.strftime("%Y-%m-%d")
-        date2 = d2.strftime("%Y-%m-%d") if d2 else date1
-        status.write("Fetching Billboard Hot 100 (two dates)…")
-        chart1 = fetch_hot100(date1)
-        chart2 = fetch_hot100(date2)
-        list_for_search = _interleave_unique(chart1, chart2, limit=100)
-        year = None  # blend: yıl filtreyi sıkı tutmayalım
-        poster_date_text = f"{date1} × {date2}"
-        default_name = f"Bestie Blend — {date1} × {date2}"
-        subtitle = "Bestie Blend"
-
-    # --- Spotify ---
-    status.write("Connecting to Spotify…")
-    sp = SpotifyClient(enable_cover_upload=upload_cover)
-
-    # Eşleştirme
-    uris, missing = [], []
-    total = max(len(list_for_search), 1)
-    for i, e in enumerate(list_for_search, start=1):
-        yr = (year or (e.rank and ""))  # blend modda yıl yoksa boş geç
-        uri = sp.search_best_track(e.title, e.artist, yr if yr else "")
-        (uris if uri else missing).append(uri or e)
-        pct = int(round(i * 100 / total))
-        bar.progress(pct, text=f"Matching tracks… {i}/{total}")
-
-    # Playlist oluştur / güncelle (aynı isimde varsa içerik REPLACE)
-    status.write("Creating/updating playlist…")
-    name = (custom_name or default_name).strip()
-    desc = (f"Billboard Hot 100 - {poster_date_text}. Generated by hitcapsule."
-            if not blend_mode else
-            f"Bestie Blend — {poster_date_text}. Generated by hitcapsule.")
-    pid, created_new = sp.upsert_playlist_with_items(
-        name=name,
-        public=make_public,
-        description=desc,
-        uris=[u for u in uris if isinstance(u, str)],
-        replace=True  # aynı isimdeyse içeriği tamamen yenile
-    )
-    url = sp.get_playlist_url(pid)
-
-    # Görseller
-    status.write("Rendering poster/cover…")
-    os.makedirs("artifacts", exist_ok=True)
-    cover_path = os.path.join("artifacts", f"cover_{poster_date_text.replace(' ','_').replace(':','-')}.jpg")
-    poster_path = os.path.join("artifacts", f"poster_{poster_date_text.replace(' ','_').replace(':','-')}.png")
-    make_cover(poster_date_text, cover_path, playlist_name=name)
-    # Poster: Top 10
-    top10 = [(c.title, c.artist) for c in list_for_search[:10]]
-    make_story_poster(poster_date_text, top10, url, poster_path, playlist_name=name, top_k=10, subtitle=subtitle)
-
-    uploaded = False
-    if upload_cover:
-        uploaded = sp.upload_cover_image(pid, cover_path)
+    # Bağımsız adımlar tek bir havuzda üst üste biner:
+    # Spotify bağlantısı ‖ Billboard, kapak ‖ eşleştirme, kapak yükleme ‖ poster.
+    with ThreadPoolExecutor(max_workers=4) as pipeline:
+        f_sp = pipeline.submit(_get_spotify, upload_cover)
+
+        # --- Chart(lar)ı çek ---
+        if not blend_mode:
+            date1 = d1.strftime("%Y-%m-%d")
+            status.write("Fetching Billboard Hot 100…")
+            chart = fetch_hot100_cached(date1)
+            year = date1.split("-")[0]
+            list_for_search = chart
+            poster_date_text = date1
+            default_name = f"{date1} Billboard Hot 100"
+            subtitle = None
+        else:
+            date1 = d1.strftime("%Y-%m-%d")
+            date2 = d2.strftime("%Y-%m-%d") if d2 else date1
+            status.write("Fetching Billboard Hot 100 (two dates)…")
+            # İki tarih bağımsız → aynı anda çek
+            f1 = pipeline.submit(fetch_hot100_cached, date1)
+            f2 = pipeline.submit(fetch_hot100_cached, date2)
+            chart1, chart2 = f1.result(), f2.result()
+            list_for_search = _interleave_unique(chart1, chart2, limit=100)
+            year = None  # blend: yıl filtreyi sıkı tutmayalım
+            poster_date_text = f"{date1} × {date2}"
+            default_name = f"Bestie Blend — {date1} × {date2}"
+            subtitle = "Bestie Blend"
+
+        name = (custom_name or default_name).strip()
+        desc = (f"Billboard Hot 100 - {poster_date_text}. Generated by hitcapsule."
+                if not blend_mode else
+                f"Bestie Blend — {poster_date_text}. Generated by hitcapsule.")
+
+        # Kapak playlist URL'sine bağlı değil → eşleştirme sürerken çizilsin
+        os.makedirs("artifacts", exist_ok=True)
+        cover_path = _artifact_path("cover", poster_date_text, "jpg", name)
+        # Aynı girdilerle tekrar çizme
+        f_cover = pipeline.submit(
+            _render_once, cover_path, make_cover, poster_date_text, cover_path, playlist_name=name
+        )
+
+        # --- Spotify ---
+        status.write("Connecting to Spotify…")
+        sp = f_sp.result()
+
+        # Eşleştirme: aramalar SpotifyClient.search_many ile paralel.
+        yr = year or ""  # blend modda yıl yoksa boş geç
+        # Önbellekte olanlar hiç kuyruğa girmez; yalnızca bulunan uri'ler saklanır
+        # (geçici hatalar kalıcı "missing" olarak önbelleğe düşmesin).
+        cache = _search_cache()
+        throttled_before = sp.rate_limit_hits
+        keys = [(sp.market, _key_norm(e.title, e.artist), yr) for e in list_for_search]
+        found = [cache.get(k) for k in keys]
+        pending = [i for i, uri in enumerate(found) if uri is None]
+        total = max(len(list_for_search), 1)
+        cached_hits = len(list_for_search) - len(pending)
+
+        def _on_progress(done: int, _pending_total: int) -> None:
+            n = cached_hits + done
+            bar.progress(int(round(n * 100 / total)), text=f"Matching tracks… {n}/{total}")
+
+        # Önbellek isabetlerini hemen göster; hepsi önbellekteyse bar burada %100 olur
+        _on_progress(0, len(pending))
+        matched = sp.search_many(
+            [(list_for_search[i].title, list_for_search[i].artist, yr) for i in pending],
+            on_progress=_on_progress,
+        )
+        for i, uri in zip(pending, matched):
+            found[i] = uri
+            if uri:
+                cache.put(keys[i], uri)
+
+        if sp.rate_limit_hits > throttled_before:
+            st.warning("Spotify rate limit reached — searches were paused and retried, so this took longer.")
+
+        # Orijinal sırayı koru
+        uris, missing = [], []
+        for e, uri in zip(list_for_search, found):
+            (uris if uri else missing).append(uri or e)
+
+        # Playlist oluştur / güncelle (aynı isimde varsa içerik REPLACE)
+        status.write("Creating/updating playlist…")
+        pid, created_new = sp.upsert_playlist_with_items(
+            name=name,
+            public=make_public,
+            description=desc,
+            uris=[u for u in uris if isinstance(u, str)],
+            replace=True  # aynı isimdeyse içeriği tamamen yenile
+        )
+
+        # Kapak yükleme arka planda; URL + poster bu sırada
+        f_upload = (pipeline.submit(lambda: sp.upload_cover_image(pid, f_cover.result()))
+                    if upload_cover else None)
+        url = sp.get_playlist_url(pid)
+
+        # Görseller
+        status.write("Rendering poster/cover…")
+        # Poster: Top 10
+        top10 = list_for_search[:10]
+        titles = tuple(f"{i}. {c.title}" for i, c in enumerate(top10, start=1))
+        artists = tuple(c.artist for c in top10)
+        poster_path = _artifact_path("poster", poster_date_text, "jpg", name, url, titles, artists, subtitle)
+        poster_path = _render_once(
+            poster_path, make_story_poster, poster_date_text, titles, artists, url, poster_path,
+            playlist_name=name, top_k=10, subtitle=subtitle,
+        )
+
+        cover_path = f_cover.result()
+        uploaded = f_upload.result() if f_upload else False
+
+    _prune_artifacts()
 
     duration = time.perf_counter() - start
     _store_result(
@@ -263,6 +407,7 @@ with right:
             PREVIEW_W = 180
             st.image(res["poster_path"], caption=f"Poster preview ({PREVIEW_W}px)", width=PREVIEW_W)
             with open(res["poster_path"], "rb") as f:
-                st.download_button("Download poster.png", f, file_name=os.path.basename(res["poster_path"]))
+                st.download_button("Download poster.jpg", f, file_name=os.path.basename(res["poster_path"]),
+                                   mime="image/jpeg")
             with st.expander("View full-size poster"):
                 st.image(res["poster_path"], width="stretch")
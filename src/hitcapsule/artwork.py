@@ -1,33 +1,90 @@
 from __future__ import annotations
-from typing import List, Tuple, Optional
+from typing import List, Literal, Sequence, Tuple, Optional
 from PIL import Image, ImageDraw, ImageFont
+import functools
 import qrcode
 import os
+import threading
 
 # ---- Typo-safe font helper -------------------------------------------------
-def _font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-    """Try a system TTF; fall back to PIL default."""
+# Kapak ve poster aynı anda çizilebildiği için font yükleme kilitli ve paylaşımlı
+_FONT_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=64)
+def _load_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     try:
         # Arial çoğu Windows'ta var; yoksa fallback'e düşer
         return ImageFont.truetype("arial.ttf", size)
     except Exception:
         return ImageFont.load_default()
 
+def _font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Try a system TTF; fall back to PIL default. Loaded once per size."""
+    with _FONT_LOCK:
+        return _load_font(size)
+
+# Kapak/posterde kullanılan boyutları import sırasında ısıt
+for _size in (18, 24, 26, 28, 34, 36, 40, 50, 52, 72):
+    _load_font(_size)
+del _size
+
 def _text_ellipsize(
     d: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont, max_w: int
 ) -> str:
-    """Fit text into max_w with … using binary search."""
-    if d.textlength(text, font=font) <= max_w:
+    """
+    Fit text into max_w with …. The cut is estimated from the string's own
+    average glyph width and verified with 1–2 measurements; binary search
+    only runs when the estimate misses.
+    """
+    full = d.textlength(text, font=font)
+    if not text or full <= max_w:
         return text
+
+    def fits(n: int) -> bool:
+        return d.textlength(text[:n] + "…", font=font) <= max_w
+
+    # Invariant: text[:hi] + "…" sığmaz (tüm metin bile sığmadı), lo'dan küçükler sığar
     lo, hi = 0, len(text)
+    n = max(0, min(len(text) - 1, int(max_w * len(text) / full)))
+    if fits(n):
+        if not fits(n + 1):
+            return text[:n] + "…"
+        lo = n + 2
+    else:
+        if n > 0 and fits(n - 1):
+            return text[:n - 1] + "…"
+        hi = max(n - 1, 0)
     while lo < hi:
         mid = (lo + hi) // 2
-        t = text[:mid] + "…"
-        if d.textlength(t, font=font) <= max_w:
+        if fits(mid):
             lo = mid + 1
         else:
             hi = mid
-    return (text[:max(lo - 1, 0)] + "…") if text else ""
+    return text[:max(lo - 1, 0)] + "…"
+
+def _draw_rows(
+    d: ImageDraw.ImageDraw, xy: Tuple[int, int], lines: List[str],
+    font: ImageFont.ImageFont, row_h: int, fill: Tuple[int, int, int],
+) -> None:
+    """Sabit row_h aralıklı satırları tek multiline_text çağrısıyla çiz."""
+    if not lines:
+        return
+    # multiline_text satır adımı = "A" yüksekliği + spacing → row_h'ye tamamla
+    spacing = row_h - d.textbbox((0, 0), "A", font=font)[3]
+    d.multiline_text(xy, "\n".join(lines), font=font, fill=fill, spacing=spacing)
+
+def _qr_image(data: str, size: int, border: int = 2) -> Image.Image:
+    """
+    QR matrisinden doğrudan 1 px/modül gri ton görüntü kurar, NEAREST ile
+    büyütür (make_image → convert → resize zinciri yok). Siyah modül, beyaz zemin.
+    """
+    qr = qrcode.QRCode(border=border)
+    qr.add_data(data)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()  # border dahil
+    n = len(matrix)
+    pixels = bytes(0 if cell else 255 for row in matrix for cell in row)
+    return Image.frombytes("L", (n, n), pixels).resize((size, size), Image.NEAREST)
 
 # Marka rengi: Spotify yeşili
 BRAND = (29, 185, 84)
@@ -66,30 +123,37 @@ def make_cover(
 
     # "generated with " + HitCapsule (renkli)
     gen = "generated with "
+    gen_f = _font(18)
     gx = 40
     gy = H - 60
-    d.text((gx, gy), gen, font=_font(18), fill=(160, 160, 160))
-    gx += int(d.textlength(gen, font=_font(18)))
-    d.text((gx, gy), "HitCapsule", font=_font(18), fill=BRAND)
+    d.text((gx, gy), gen, font=gen_f, fill=(160, 160, 160))
+    gx += int(d.textlength(gen, font=gen_f))
+    d.text((gx, gy), "HitCapsule", font=gen_f, fill=BRAND)
 
     os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
-    img.save(save_path, "JPEG", quality=92)
+    # Spotify kapak limiti ~256 KB (base64); 85 + progressive fazlasıyla yeterli
+    img.save(save_path, "JPEG", quality=85, optimize=True, progressive=True, subsampling="4:2:0")
     return save_path
 
 # ---------------- POSTER ----------------
 def make_story_poster(
     date_text: str,
-    songs: List[Tuple[str, str]],
+    titles: Sequence[str],
+    artists: Sequence[str],
     playlist_url: str,
     save_path: str,
     playlist_name: Optional[str] = None,
     top_k: int = 10,
     subtitle: Optional[str] = None,
+    poster_format: Literal["png", "jpg"] = "jpg",
 ) -> str:
     """
     1080x1920 story posteri.
     Üstten aşağı: Playlist adı → (opsiyonel alt başlık) → Tarih → Top-N şarkı → sağ altta QR.
+    titles/artists paralel diziler; başlıklar sıra numarasıyla hazır gelir ("1. Title").
     Sol altta: Billboard Hot 100 + generated with HitCapsule.
+    Poster sadece gösterilip indirildiği için varsayılan JPEG; uzantı formata göre
+    düzeltilir, yazılan yol döner.
     """
     W, H = 1080, 1920
     img = Image.new("RGB", (W, H), BG)
@@ -125,19 +189,13 @@ def make_story_poster(
     right_safe = qr_target + 100
     max_w = W - x0 - right_safe
 
-    for i, (title, artist) in enumerate(songs[:top_k], start=1):
-        yy = list_start + (i - 1) * row_h
-        t = _text_ellipsize(d, f"{i}. {title}", title_f, max_w)
-        a = _text_ellipsize(d, f"{artist}", artist_f, max_w)
-        d.text((x0, yy), t, font=title_f, fill=FG)
-        d.text((x0, yy + 42), a, font=artist_f, fill=MUTED)
+    title_lines = [_text_ellipsize(d, t, title_f, max_w) for t in titles[:top_k]]
+    artist_lines = [_text_ellipsize(d, a, artist_f, max_w) for a in artists[:top_k]]
+    _draw_rows(d, (x0, list_start), title_lines, title_f, row_h, FG)
+    _draw_rows(d, (x0, list_start + 42), artist_lines, artist_f, row_h, MUTED)
 
     # QR + üstünde etiket (sağ altta)
-    qr = qrcode.QRCode(border=2, box_size=8)
-    qr.add_data(playlist_url)
-    qr.make(fit=True)
-    qr_img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
-    qr_img = qr_img.resize((qr_target, qr_target))
+    qr_img = _qr_image(playlist_url, qr_target)
 
     qr_x = W - qr_target - 60
     qr_y = H - qr_target - 60
@@ -154,12 +212,18 @@ def make_story_poster(
     # Sol alt etiketler
     d.text((60, H - 92), "Billboard Hot 100", font=_font(24), fill=MUTED)
     gen = "generated with "
+    gen_f = _font(18)
     gx = 60
     gy = H - 60
-    d.text((gx, gy), gen, font=_font(18), fill=(160, 160, 160))
-    gx += int(d.textlength(gen, font=_font(18)))
-    d.text((gx, gy), "HitCapsule", font=_font(18), fill=BRAND)
+    d.text((gx, gy), gen, font=gen_f, fill=(160, 160, 160))
+    gx += int(d.textlength(gen, font=gen_f))
+    d.text((gx, gy), "HitCapsule", font=gen_f, fill=BRAND)
 
     os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
-    img.save(save_path, "PNG")
+    save_path = os.path.splitext(save_path)[0] + "." + poster_format
+    if poster_format == "jpg":
+        img.save(save_path, "JPEG", quality=88, progressive=True, subsampling="4:2:0")
+    else:
+        # Yerel artefakt: level 1 encode'u birkaç kat hızlı, dosya biraz büyük
+        img.save(save_path, "PNG", optimize=False, compress_level=1)
     return save_path
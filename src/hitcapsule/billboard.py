@@ -1,9 +1,11 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import Dict, List, Optional, Set, Tuple
 import logging
+import re
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 logger = logging.getLogger(__name__)
@@ -14,7 +16,17 @@ USER_AGENT = (
 )
 BASE_URL = "https://www.billboard.com/charts/hot-100/"
 
-@dataclass
+# Keep-alive session: reuses the TLS connection across retries and blend-mode fetches.
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"})
+
+# Only build the chart rows; the rest of the page is never looked at.
+# Strainers see the raw class string (rows carry several classes), so match the token.
+_CHART_ITEMS = SoupStrainer(
+    "li", class_=re.compile(r"(?:^|\s)o-chart-results-list__item(?:\s|$)")
+)
+
+@dataclass(frozen=True)
 class ChartEntry:
     rank: int
     title: str
@@ -23,11 +35,22 @@ class ChartEntry:
 def _clean(text: str) -> str:
     return " ".join(text.split()).strip()
 
+def _first_with_classes(tags: List[Tag], *preferred: Set[str]) -> Optional[Tag]:
+    """
+    First tag carrying every class of the earliest matching preference,
+    else the first tag. Same result as chaining select_one() calls, but
+    walks the subtree once instead of once per selector.
+    """
+    for wanted in preferred:
+        for tag in tags:
+            if wanted.issubset(tag.get("class") or ()):
+                return tag
+    return tags[0] if tags else None
+
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=6))
 def _fetch_html(url: str) -> str:
     logger.info("Fetching Billboard page: %s", url)
-    headers = {"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"}
-    resp = requests.get(url, headers=headers, timeout=20)
+    resp = _SESSION.get(url, timeout=20)
     resp.raise_for_status()
     return resp.text
 
@@ -38,27 +61,24 @@ def fetch_hot100(date_yyyy_mm_dd: str) -> List[ChartEntry]:
     Uses multiple selector fallbacks to be resilient to minor HTML changes.
     """
     html = _fetch_html(BASE_URL + date_yyyy_mm_dd)
-    soup = BeautifulSoup(html, "html.parser")
+    items_soup = BeautifulSoup(html, "lxml", parse_only=_CHART_ITEMS)
 
     entries: List[ChartEntry] = []
 
     # Primary strategy: iterate chart items when present
-    items = soup.select("li.o-chart-results-list__item")
+    items = items_soup.find_all("li", class_="o-chart-results-list__item")
     if items:
         rank = 0
         for li in items:
-            # Title fallbacks
+            # Title fallbacks: h3#title-of-a-story → h3.c-title → h3
+            h3s = li.find_all("h3")
             title_el = (
-                li.select_one("h3#title-of-a-story") or
-                li.select_one("h3.c-title") or
-                li.select_one("h3")
+                next((h for h in h3s if h.get("id") == "title-of-a-story"), None) or
+                _first_with_classes(h3s, {"c-title"})
             )
-            # Artist fallbacks
-            artist_el = (
-                li.select_one("span.c-label.a-no-truncate") or
-                li.select_one("span.a-no-truncate") or
-                li.select_one("span.c-label") or
-                li.select_one("span")
+            # Artist fallbacks: span.c-label.a-no-truncate → span.a-no-truncate → span.c-label → span
+            artist_el = _first_with_classes(
+                li.find_all("span"), {"c-label", "a-no-truncate"}, {"a-no-truncate"}, {"c-label"}
             )
             if title_el:
                 rank += 1
@@ -66,8 +86,10 @@ def fetch_hot100(date_yyyy_mm_dd: str) -> List[ChartEntry]:
                 artist = _clean(artist_el.get_text()) if artist_el else ""
                 entries.append(ChartEntry(rank=rank, title=title, artist=artist))
 
-    # Fallback strategy: older/simple structure (common tutorial selector)
+    # Fallback strategy: older/simple structure (common tutorial selector).
+    # Needs the full document, so it is only parsed when the strained pass found nothing.
     if not entries:
+        soup = BeautifulSoup(html, "lxml")
         titles = [t.get_text().strip() for t in soup.select("li ul li h3")]
         # artists may be next siblings or nearby spans; best-effort
         artist_candidates = [a.get_text().strip() for a in soup.select("li ul li span")]
@@ -75,23 +97,15 @@ def fetch_hot100(date_yyyy_mm_dd: str) -> List[ChartEntry]:
             artist = artist_candidates[i - 1] if i - 1 < len(artist_candidates) else ""
             entries.append(ChartEntry(rank=i, title=_clean(title), artist=_clean(artist)))
 
-    # Normalize length to at most 100 and filter empty titles
-    entries = [e for e in entries if e.title]
-    # Deduplicate while preserving order (some pages render extras)
-    seen = set()
-    deduped: List[ChartEntry] = []
+    # Filter empty titles and deduplicate in one pass (some pages render extras);
+    # dicts keep insertion order, so the first occurrence wins.
+    uniq: Dict[Tuple[str, str], ChartEntry] = {}
     for e in entries:
-        key = (e.title.lower(), e.artist.lower())
-        if key in seen:
-            continue
-        seen.add(key)
-        deduped.append(e)
+        if e.title:
+            uniq.setdefault((e.title.lower(), e.artist.lower()), e)
 
-    # Keep top 100
-    deduped = deduped[:100]
-    # Fix ranks
-    for idx, e in enumerate(deduped, start=1):
-        e.rank = idx
+    # Keep top 100 and fix ranks
+    deduped = [replace(e, rank=idx) for idx, e in enumerate(islice(uniq.values(), 100), start=1)]
 
     logger.info("Fetched %d chart entries", len(deduped))
     return deduped
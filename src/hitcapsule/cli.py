@@ -65,8 +65,8 @@ def main(argv: List[str] | None = None) -> None:
     uris: List[str] = []
     missing: List[ChartEntry] = []
 
-    for e in chart:
-        uri = sp.search_best_track(e.title, e.artist, year)
+    found = sp.search_many([(e.title, e.artist, year) for e in chart])
+    for e, uri in zip(chart, found):
         if uri:
             uris.append(uri)
             logging.debug("Matched: #%d %s — %s", e.rank, e.title, e.artist)
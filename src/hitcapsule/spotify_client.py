@@ -1,57 +1,149 @@
 from __future__ import annotations
-from typing import Iterable, Optional, List, Tuple
+from typing import Callable, Dict, Iterable, Optional, List, Sequence, Tuple
 import logging
+import mmap
 import os
+import random
+import threading
 import time
 import re
-import difflib
 import base64
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import islice
 
+import numpy as np
 import spotipy
+from diskcache import Cache
+from rapidfuzz import fuzz, process, utils
 from spotipy.oauth2 import SpotifyOAuth
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
+# Spotify: playlist ekleme/değiştirme isteği başına en fazla 100 öğe
+MAX_ITEMS_PER_REQUEST = 100
+
+# Arama önbelleği: en fazla bu kadar sorgu; başarısız sorgular kısa süre tutulur
+QUERY_CACHE_SIZE = 2048
+FAILED_QUERY_TTL = 30.0
+# Diskteki arama yanıtları: Spotify sonuçları kısa vadede sabit, birkaç gün yeterli
+SEARCH_CACHE_TTL = 7 * 86400
+
+# 429 sonrası en fazla bu kadar deneme (özyineleme yok)
+MAX_RATE_LIMIT_RETRIES = 6
+
+# Arama: tek geniş sorgudan kaç aday, hangi puanın altında yedek sorguya düşülür
+SEARCH_LIMIT = 20
+MIN_MATCH_SCORE = 0.55
+
+# Playlist isim indeksi bu kadar saniye geçerli (Spotify'da elle yapılan değişiklikler için)
+PLAYLIST_INDEX_TTL = 300.0
+PLAYLIST_PAGE_WORKERS = 8
+
 # ------------------------ Benzerlik / Temizleme ------------------------
 
-def _similar(a: str, b: str) -> float:
-    return difflib.SequenceMatcher(None, a.lower(), b.lower()).ratio()
+# Aday puanı = 0.6·başlık + 0.25·sanatçı + 0.15·popülerlik/100
+_W_TITLE, _W_ARTIST, _W_POP = 0.6, 0.25, 0.15
+_W_POP_PER_POINT = _W_POP / 100.0  # popülerlik 0..100 → tek çarpım
+_NO_ARTIST_SCORE = 0.5  # sanatçı bilinmiyorsa nötr
+
+@lru_cache(maxsize=8192)
+def _match_key(text: str) -> str:
+    """Karşılaştırma biçimi (küçük harf, noktalama yok); string başına bir kez hesaplanır."""
+    return utils.default_process(text)
+
+def _similarity_row(want_key: str, cand_keys: List[str]) -> np.ndarray:
+    """
+    want_key ile her aday arasındaki benzerlik (0..1), tek cdist çağrısıyla.
+    Girdiler _match_key'den geçmiş olmalı; cdist ayrıca işlemez.
+    """
+    # C++ token-set benzerliği; altında RapidFuzz'ın bit-paralel Indel mesafesi çalışır
+    # (≤64 karakterlik stringlerde tek makine kelimesi), ayrı bir Levenshtein paketi gereksiz.
+    row = process.cdist([want_key], cand_keys, scorer=fuzz.token_set_ratio, processor=None)[0]
+    return row / 100.0
 
 _APOSTROPHE_FIX = str.maketrans({"’": "'", "‘": "'", "“": '"', "”": '"', "–": "-", "—": "-"})
 def _unify_quotes(text: str) -> str: return text.translate(_APOSTROPHE_FIX)
 
-_PAREN_RE = re.compile(r"\([^)]*\)")
-_BRACK_RE = re.compile(r"\[[^]]*\]")
+# (...) ve [...] tek geçişte
+_BRACKETS_RE = re.compile(r"\([^)]*\)|\[[^\]]*\]")
 def _strip_brackets(text: str) -> str:
-    text = _PAREN_RE.sub("", text)
-    text = _BRACK_RE.sub("", text)
-    return text
+    return _BRACKETS_RE.sub("", text)
 
 def _collapse_spaces(text: str) -> str: return " ".join(text.split()).strip()
 
+# Aynı başlık/sanatçılar sorgu döngüsünde ve adaylarda sürekli tekrar ediyor
+@lru_cache(maxsize=4096)
 def _sanitize_title(title: str) -> str:
     title = _unify_quotes(title)
     title = _strip_brackets(title)
     return _collapse_spaces(title)
 
 _SPLIT_RE = re.compile(r"\s*(?:,|&| x |×| with | and | feat\.| featuring | ft\.|\+)\s*", flags=re.IGNORECASE)
+@lru_cache(maxsize=4096)
 def _primary_artist(artist: str) -> str:
     artist = _collapse_spaces(_unify_quotes(artist or ""))
     parts = _SPLIT_RE.split(artist) if artist else []
     return parts[0] if parts else artist
 
+_TITLE_SPLIT_RE = re.compile(r"/|\s\|\s")
 def _title_candidates(want_title: str) -> List[str]:
     base = _sanitize_title(want_title or "")
     cands = [base]
     if "/" in base or " | " in base:
-        import re as _re
-        parts = _re.split(r"/|\s\|\s", base)
-        parts = [p.strip() for p in parts if p and len(p.strip()) > 1]
-        for p in parts:
-            if p not in cands: cands.append(p)
+        seen = {base}
+        for p in _TITLE_SPLIT_RE.split(base):
+            p = p.strip()
+            if len(p) > 1 and p not in seen:
+                seen.add(p)
+                cands.append(p)
     return cands
 
+def _name_key(name: Optional[str]) -> str:
+    return (name or "").strip().lower()
+
+# ------------------------------ Rate limit ------------------------------
+
+class _TokenBucket:
+    """
+    Thread-safe token bucket (rate istek/sn, en fazla burst birikir).
+    429 gelince pause() tüm worker'ları birlikte bekletir.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+        self.pauses = 0
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._resume_at:
+                    wait = self._resume_at - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                    self._last = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+            # Bekleme bitince sıfırdan dolsun, birikmiş burst ile tekrar 429 yemeyelim
+            self._tokens = 0.0
+            self._last = self._resume_at
+            self.pauses += 1
+
 # ----------------------------------------------------------------------
 
 class SpotifyClient:
@@ -88,6 +180,20 @@ class SpotifyClient:
         # Market: parametre > ENV > "US"
         self.market = (market or os.getenv("SPOTIFY_MARKET") or "US").upper()
 
+        # Tüm API çağrıları için ortak hız sınırı: 429'a düşmeden önce yavaşla
+        rate = max(0.1, float(os.getenv("SPOTIFY_RATE_PER_SEC") or 10))
+        self._bucket = _TokenBucket(rate=rate, burst=max(1, int(rate * 2)))
+
+        # Arama sonuçları için LRU: (q, market, limit) → (bitiş zamanı | None, sonuç)
+        self._query_cache: "OrderedDict[Tuple[str, str, int], Tuple[Optional[float], Optional[dict]]]" = OrderedDict()
+        self._query_lock = threading.Lock()
+        # Çalıştırmalar arası kalıcı arama önbelleği (yalnızca başarılı yanıtlar)
+        self._disk_cache = Cache(os.getenv("SPOTIFY_SEARCH_CACHE_DIR") or os.path.join(cache_dir, "search_cache"))
+
+        # find_playlist_by_name için isim indeksi (ilk kullanımda kurulur)
+        self._playlist_index: Optional[Dict[str, Tuple[str, dict]]] = None
+        self._playlist_index_at = 0.0
+
         me = self.sp.current_user()
         self.user_id = me["id"]
         logger.info("Authenticated as %s", me.get("display_name", self.user_id))
@@ -95,64 +201,99 @@ class SpotifyClient:
     # ------------------------------- Playlist helpers -------------------------------
 
     def create_playlist(self, name: str, public: bool = False, description: str = "") -> str:
+        self._acquire()
         playlist = self.sp.user_playlist_create(user=self.user_id, name=name, public=public, description=description)
         logger.info("Created playlist: %s (%s)", name, playlist["id"])
+        # Yeni playlist listenin en üstüne gelir → taramada da önce o bulunurdu
+        self._index_playlist(playlist)
         return playlist["id"]
 
     def get_playlist_url(self, playlist_id: str) -> str:
+        self._acquire()
         pl = self.sp.playlist(playlist_id, fields="external_urls")
         return pl["external_urls"]["spotify"]
 
-    def add_items_chunked(self, playlist_id: str, uris: Iterable[str], chunk: int = 100) -> None:
-        batch: List[str] = []
-        for uri in uris:
-            batch.append(uri)
-            if len(batch) == chunk:
-                self.sp.playlist_add_items(playlist_id=playlist_id, items=batch)
-                batch = []
-        if batch:
+    def add_items_chunked(self, playlist_id: str, uris: Iterable[str], chunk: int = MAX_ITEMS_PER_REQUEST) -> None:
+        # API istek başına en fazla 100 uri kabul ediyor; fazlası 400 döner
+        chunk = max(1, min(chunk, MAX_ITEMS_PER_REQUEST))
+        it = iter(uris)
+        while True:
+            batch = list(islice(it, chunk))
+            if not batch:
+                break
+            self._acquire()
             self.sp.playlist_add_items(playlist_id=playlist_id, items=batch)
 
     def replace_items(self, playlist_id: str, uris: List[str]) -> None:
         """Tüm içeriği uris ile değiştir (ilk 100 replace, kalanı append)."""
-        first = uris[:100]
-        rest  = uris[100:]
+        first = uris[:MAX_ITEMS_PER_REQUEST]
+        rest  = uris[MAX_ITEMS_PER_REQUEST:]
+        self._acquire()
         self.sp.playlist_replace_items(playlist_id, first)
         if rest:
-            self.add_items_chunked(playlist_id, rest, chunk=100)
+            self.add_items_chunked(playlist_id, rest)
 
     def upload_cover_image(self, playlist_id: str, image_path: str) -> bool:
         """JPEG'yi base64 string olarak yükler. Scope yoksa False döner."""
         try:
-            with open(image_path, "rb") as f:
-                b64 = base64.b64encode(f.read()).decode("ascii")
+            # Dosyayı ayrıca belleğe kopyalamadan doğrudan mmap üzerinden kodla
+            with open(image_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                b64 = base64.b64encode(mm).decode("ascii")
+            self._acquire()
             self.sp.playlist_upload_cover_image(playlist_id, b64)
             return True
-        except spotipy.SpotifyException as e:
+        except (spotipy.SpotifyException, ValueError, OSError) as e:
+            # ValueError: boş dosya mmap edilemez (yarım yazılmış/0 baytlık kapak)
             logger.warning("Cover upload failed: %s", e)
             return False
 
+    def _playlists_page(self, offset: int, limit: int) -> dict:
+        self._acquire()
+        return self.sp.current_user_playlists(limit=limit, offset=offset)
+
     def _iter_my_playlists(self, limit: int = 50):
-        """Kullanıcının tüm playlist’lerini sayfalar halinde getir."""
-        offset = 0
-        while True:
-            page = self.sp.current_user_playlists(limit=limit, offset=offset)
-            items = page.get("items", [])
-            if not items:
-                break
-            for it in items:
-                yield it
-            offset += len(items)
-            if offset >= page.get("total", 0):
-                break
+        """
+        Kullanıcının tüm playlist’lerini sayfalar halinde getir. İlk sayfa toplamı
+        verir; kalan offset'ler bilindiği için paralel çekilir, sıra korunur.
+        """
+        first = self._playlists_page(0, limit)
+        items = first.get("items", [])
+        yield from items
+        total = first.get("total", 0)
+        if not items or len(items) >= total:
+            return
+        offsets = range(len(items), total, limit)
+        with ThreadPoolExecutor(max_workers=min(PLAYLIST_PAGE_WORKERS, len(offsets))) as ex:
+            for page in ex.map(lambda o: self._playlists_page(o, limit), offsets):
+                yield from page.get("items", [])
+
+    def _ensure_playlist_index(self) -> Dict[str, Tuple[str, dict]]:
+        """İsim → (id, meta) indeksini bir kez kur; PLAYLIST_INDEX_TTL dolunca yenile."""
+        if self._playlist_index is None or time.monotonic() - self._playlist_index_at > PLAYLIST_INDEX_TTL:
+            index: Dict[str, Tuple[str, dict]] = {}
+            for it in self._iter_my_playlists():
+                # Listede ilk görülen kazanır (eski lineer taramayla aynı)
+                index.setdefault(_name_key(it.get("name")), (it["id"], it))
+            self._playlist_index = index
+            self._playlist_index_at = time.monotonic()
+        return self._playlist_index
+
+    def _index_playlist(self, playlist: dict) -> None:
+        """Oluşturulan/güncellenen playlist'i indekste yerinde güncelle (yeniden çekmeden)."""
+        if self._playlist_index is not None:
+            self._playlist_index[_name_key(playlist.get("name"))] = (playlist["id"], playlist)
 
     def find_playlist_by_name(self, name: str) -> Optional[Tuple[str, dict]]:
         """İsme birebir (case-insensitive) eşleşen ilk playlist'i getir."""
-        target = (name or "").strip().lower()
-        for it in self._iter_my_playlists():
-            if (it.get("name") or "").strip().lower() == target:
-                return it["id"], it
-        return None
+        return self._ensure_playlist_index().get(_name_key(name))
+
+    def _sync_details(self, playlist_id: str, name: str, public: bool, description: str) -> None:
+        """Detayları senkronla (public/description değişmiş olabilir); hata ölümcül değil."""
+        try:
+            self._acquire()
+            self.sp.playlist_change_details(playlist_id, name=name, public=public, description=description)
+        except Exception as e:
+            logger.warning("playlist_change_details failed: %s", e)
 
     def upsert_playlist_with_items(self, name: str, public: bool, description: str, uris: List[str], replace: bool = True) -> Tuple[str, bool]:
         """
@@ -165,79 +306,182 @@ class SpotifyClient:
         found = self.find_playlist_by_name(name)
         if found:
             pid, meta = found
-            # Detayları senkronla (public/description değişmiş olabilir)
-            try:
-                self.sp.playlist_change_details(pid, name=name, public=public, description=description)
-            except Exception as e:
-                logger.warning("playlist_change_details failed: %s", e)
-            if replace:
-                self.replace_items(pid, uris)
-            else:
-                self.add_items_chunked(pid, uris, chunk=100)
+            # Detay güncellemesi içerikten bağımsız → öğe yazımıyla aynı anda.
+            # Öğe parçaları ise sırayla gider: paralel eklemede playlist sırası bozulur.
+            with ThreadPoolExecutor(max_workers=1) as ex:
+                f_details = ex.submit(self._sync_details, pid, name, public, description)
+                if replace:
+                    self.replace_items(pid, uris)
+                else:
+                    self.add_items_chunked(pid, uris)
+                f_details.result()
+            self._index_playlist({**meta, "name": name, "public": public, "description": description})
             logger.info("Updated existing playlist: %s (%s)", name, pid)
             return pid, False
         else:
             pid = self.create_playlist(name=name, public=public, description=description)
             if uris:
-                self.add_items_chunked(pid, uris, chunk=100)
+                self.add_items_chunked(pid, uris)
             return pid, True
 
     # -------------------------------- Search --------------------------------
 
-    def _score_candidate(self, cand_title: str, cand_artists: str, want_title: str, want_artist: str, popularity: int) -> float:
-        s_title = _similar(want_title, cand_title)
-        s_artist = _similar(want_artist, cand_artists) if want_artist else 0.5
-        pop_norm = (popularity or 0) / 100.0
-        return (0.6 * s_title) + (0.25 * s_artist) + (0.15 * pop_norm)
+    def _score_candidates(
+        self, items: List[dict], cand_titles: List[str], want_title_key: str, want_artist_key: str
+    ) -> np.ndarray:
+        """
+        Tüm adayları tek seferde puanla: cdist (C++) + NumPy ağırlıklı toplam.
+        want_*_key değerleri çağıran tarafta _match_key ile bir kez hazırlanır.
+        """
+        s_title = _similarity_row(want_title_key, [_match_key(t) for t in cand_titles])
+        if want_artist_key:
+            cand_artists = [_match_key(", ".join(a["name"] for a in it["artists"])) for it in items]
+            s_artist = _similarity_row(want_artist_key, cand_artists)
+        else:
+            s_artist = _NO_ARTIST_SCORE
+        pops = np.fromiter((it.get("popularity") or 0 for it in items), dtype=np.float64, count=len(items))
+        return _W_TITLE * s_title + _W_ARTIST * s_artist + _W_POP_PER_POINT * pops
+
+    def _acquire(self) -> None:
+        """Her Spotify isteğinden önce token al (SPOTIFY_RATE_PER_SEC, burst = 2×rate)."""
+        self._bucket.acquire()
+
+    @property
+    def rate_limit_hits(self) -> int:
+        """Bu client'ın şimdiye kadar yediği 429 sayısı."""
+        return self._bucket.pauses
 
     def _run_query(self, q: str, limit: int = 10):
-        try:
-            logger.debug("Spotipy search q=%s market=%s", q, self.market)
-            return self.sp.search(q=q, type="track", limit=limit, market=self.market)
-        except spotipy.exceptions.SpotifyException as e:
-            if getattr(e, "http_status", None) == 429:
-                retry_after = int(getattr(e, "headers", {}).get("Retry-After", 2))
-                logger.warning("Rate-limited by Spotify. Sleeping %s sec…", retry_after)
-                time.sleep(retry_after)
-                return self._run_query(q, limit)
-            logger.error("Spotify error: %s", e)
-            return None
-        except Exception as e:
-            logger.warning("Search failed: %s", e)
-            return None
+        """Aynı (q, market, limit) için HTTP'ye tekrar gitme; hatalar kısa süre saklanır."""
+        key = (q, self.market, limit)
+        with self._query_lock:
+            hit = self._query_cache.get(key)
+            if hit is not None:
+                expires_at, res = hit
+                if expires_at is None or expires_at > time.monotonic():
+                    self._query_cache.move_to_end(key)
+                    return res
+                del self._query_cache[key]
+
+        # Bellekte yoksa diskte (önceki çalıştırmalar); yoksa ağ
+        res = self._disk_cache.get(key)
+        if res is None:
+            res = self._search_uncached(q, limit)
+            if res is not None:
+                self._disk_cache.set(key, res, expire=SEARCH_CACHE_TTL)
+        expires_at = None if res is not None else time.monotonic() + FAILED_QUERY_TTL
+        with self._query_lock:
+            self._query_cache[key] = (expires_at, res)
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return res
+
+    def _search_uncached(self, q: str, limit: int):
+        for attempt in range(MAX_RATE_LIMIT_RETRIES):
+            self._acquire()
+            try:
+                logger.debug("Spotipy search q=%s market=%s", q, self.market)
+                return self.sp.search(q=q, type="track", limit=limit, market=self.market)
+            except spotipy.exceptions.SpotifyException as e:
+                if getattr(e, "http_status", None) != 429:
+                    logger.error("Spotify error: %s", e)
+                    return None
+                # Retry-After varsa ona uy, yoksa üstel bekleme; jitter worker'ları dağıtır
+                retry_after = (getattr(e, "headers", None) or {}).get("Retry-After")
+                try:
+                    wait = float(retry_after)
+                except (TypeError, ValueError):
+                    wait = min(60, 2 ** attempt)
+                wait += random.uniform(0, 1)
+                logger.warning(
+                    "Rate-limited by Spotify (attempt %d/%d). Pausing searches %.1f sec…",
+                    attempt + 1, MAX_RATE_LIMIT_RETRIES, wait,
+                )
+                self._bucket.pause(wait)
+            except Exception as e:
+                logger.warning("Search failed: %s", e)
+                return None
+        logger.error("Giving up on query after %d rate-limited attempts: %s", MAX_RATE_LIMIT_RETRIES, q)
+        return None
 
     def search_best_track(self, title: str, artist: str, year: str) -> Optional[str]:
+        """
+        Başlık adayı başına tek geniş sorgu (track + ana sanatçı, limit=20) ve yerel
+        sıralama; en iyi puan MIN_MATCH_SCORE altındaysa sadece track: ile bir kez daha.
+        Yıl sorguya eklenmez, sonuçlarda release_date üzerinden tercih edilir.
+        """
         primary = _primary_artist(artist)
         title_opts = _title_candidates(title)
 
-        def _queries(t: str) -> List[str]:
-            qs: List[str] = []
+        primary_lower = primary.casefold()
+        primary_key = _match_key(primary) if primary else ""
+        # _title_candidates zaten temizlenmiş başlıklar döndürür
+        for norm_t in title_opts:
+            norm_lower = norm_t.casefold()
+            title_key = _match_key(norm_t)
+            queries = [f'track:"{norm_t}"']
             if primary:
-                if year:
-                    qs.append(f'track:"{t}" artist:"{primary}" year:{year}')
-                qs.append(f'track:"{t}" artist:"{primary}"')
-            if year:
-                qs.append(f'track:"{t}" year:{year}')
-            qs.append(f'track:"{t}"')
-            return qs
-
-        for t in title_opts:
-            norm_t = _sanitize_title(t)
-            for q in _queries(norm_t):
-                res = self._run_query(q, limit=10)
+                queries.insert(0, f'track:"{norm_t}" artist:"{primary}"')
+
+            best_uri: Optional[str] = None
+            best_score = -1.0
+            for q in queries:
+                res = self._run_query(q, limit=SEARCH_LIMIT)
                 items = (res or {}).get("tracks", {}).get("items", [])
                 if not items:
                     continue
-
-                best_uri = None
-                best_score = -1.0
+                if year:
+                    # O yıl çıkanlar varsa onlarla sınırla, yoksa hepsi
+                    items = [
+                        it for it in items
+                        if ((it.get("album") or {}).get("release_date") or "")[:4] == year
+                    ] or items
+
+                # Birebir başlık + ana sanatçı eşleşmesi varsa puanlamaya gerek yok.
+                # Ham ad parantezleriyle karşılaştırılır: "X (Live)" / "X [Remix]"
+                # birebir sayılmaz, o eşitliği popülerlik puanlaması çözer.
                 for it in items:
-                    cand_title = _sanitize_title(it["name"])
-                    cand_artists = ", ".join(a["name"] for a in it["artists"])
-                    score = self._score_candidate(cand_title, cand_artists, norm_t, primary, it.get("popularity", 0))
-                    if score > best_score:
-                        best_score = score
-                        best_uri = it["uri"]
-                if best_uri:
-                    return best_uri
+                    raw = _collapse_spaces(_unify_quotes(it["name"]))
+                    if raw.casefold() == norm_lower and (
+                        not primary_lower
+                        or any(primary_lower in a["name"].casefold() for a in it["artists"])
+                    ):
+                        return it["uri"]
+
+                cand_titles = [_sanitize_title(it["name"]) for it in items]
+                scores = self._score_candidates(items, cand_titles, title_key, primary_key)
+                # argmax eşitlikte ilk adayı seçer (Spotify sıralaması korunur)
+                idx = int(scores.argmax())
+                if scores[idx] > best_score:
+                    best_score = float(scores[idx])
+                    best_uri = items[idx]["uri"]
+                if best_score >= MIN_MATCH_SCORE:
+                    break
+            if best_uri:
+                return best_uri
         return None
+
+    def search_many(
+        self,
+        queries: Sequence[Tuple[str, str, str]],
+        max_workers: Optional[int] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Optional[str]]:
+        """
+        (title, artist, year) listesini paralel eşleştir; sonuçlar girdiyle aynı sırada.
+        Aramalar I/O-bound, hız sınırı token bucket'ta. on_progress(done, total)
+        çağıran thread'de tetiklenir (UI güncellemesi için güvenli).
+        """
+        if max_workers is None:
+            max_workers = int(os.getenv("HITCAPSULE_SEARCH_WORKERS", "8"))
+        results: List[Optional[str]] = [None] * len(queries)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as ex:
+            futures = {
+                ex.submit(self.search_best_track, title, artist, year): i
+                for i, (title, artist, year) in enumerate(queries)
+            }
+            for done, fut in enumerate(as_completed(futures), start=1):
+                results[futures[fut]] = fut.result()
+                if on_progress:
+                    on_progress(done, len(queries))
+        return results